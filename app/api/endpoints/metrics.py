@@ -0,0 +1,31 @@
+# app/api/endpoints/metrics.py
+from fastapi import APIRouter
+
+from app.core import admission
+from app.core.page_index import page_index
+from app.services.page_service import page_writer
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("/admission")
+async def read_admission_metrics():
+    """
+    Get queue depth, in-flight scrapes and rejection counters of the cold-scrape admission control.
+    """
+    return admission.scrape_admission.stats()
+
+
+@router.get("/page-index")
+async def read_page_index_metrics():
+    """
+    Get size, freshness and hit/miss counters of the in-memory /pages index.
+    """
+    return page_index.stats()
+
+
+@router.get("/write-behind")
+async def read_write_behind_metrics():
+    """
+    Get buffer depth, flush and backpressure counters of the write-behind persistence stage.
+    """
+    return page_writer.stats()
@@ -1,9 +1,12 @@
 # app/api/endpoints/pages.py
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 
 from sqlalchemy.orm import Session
+from app.core import admission, database
 from app.core.database import get_db
+from app.core.write_behind import WriteBehindUnavailable
 from app.services import page_service
 from app.schemas import page as page_schema, social_media_user as user_schema, post as post_schema
 
@@ -25,21 +28,46 @@ async def read_pages(
     pages = page_service.get_paged_pages(db, skip=skip, limit=limit, name=name, industry=industry, min_followers=min_followers, max_followers=max_followers)
     return pages
 
+def _scrape_in_new_session(page_id: str):
+    # Runs in the threadpool once admitted, so a cold request only holds a connection while scraping
+    db = database.SessionLocal()
+    try:
+        db_page = page_service.scrape_and_save_page(db, page_id=page_id)
+        if db_page:
+            db.refresh(db_page)
+        return db_page
+    finally:
+        db.close()
+
 @router.get("/{page_id}", response_model=page_schema.Page)
-async def read_page(page_id: str, db: Session = Depends(get_db)):
+async def read_page(page_id: str, request: Request, db: Session = Depends(get_db)):
     """
     Get details of a page by its page_id.
     If the page is not in the database, it will be scraped and stored.
+    Scrapes go through admission control; cached pages are always served.
     """
-    db_page = page_service.get_page_by_page_id(db, page_id=page_id)
+    try:
+        db_page = await run_in_threadpool(page_service.get_page_by_page_id, db, page_id=page_id)
+    finally:
+        # Give the connection back to the pool before a possibly long wait for a scrape slot
+        db.close()
+    if db_page:
+        return db_page
+
+    client_id = admission.client_identity(request.headers, request.client.host if request.client else None)
+    try:
+        async with admission.scrape_admission.admit(client_id):
+            db_page = await run_in_threadpool(_scrape_in_new_session, page_id)
+    except admission.AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+    except WriteBehindUnavailable:
+        raise HTTPException(status_code=503, detail="Too many pages being saved, try again later",
+                            headers={"Retry-After": str(admission.scrape_admission.retry_after)})
+
     if db_page:
         return db_page
     else:
-        db_page = page_service.scrape_and_save_page(db, page_id=page_id)
-        if db_page:
-            return db_page
-        else:
-            raise HTTPException(status_code=404, detail="Page not found or could not be scraped")
+        raise HTTPException(status_code=404, detail="Page not found or could not be scraped")
 
 @router.get("/{page_id}/employees", response_model=List[user_schema.SocialMediaUser])
 async def read_page_employees(page_id: str, db: Session = Depends(get_db), skip: int = 0, limit: int = 10):
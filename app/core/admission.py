@@ -0,0 +1,122 @@
+# app/core/admission.py
+import asyncio
+import hashlib
+import os
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Optional
+
+SCRAPE_MAX_CONCURRENCY = int(os.getenv("SCRAPE_MAX_CONCURRENCY", "4"))
+SCRAPE_MAX_QUEUE = int(os.getenv("SCRAPE_MAX_QUEUE", "16"))
+SCRAPE_PER_CLIENT_LIMIT = int(os.getenv("SCRAPE_PER_CLIENT_LIMIT", "2"))
+SCRAPE_QUEUE_TIMEOUT = float(os.getenv("SCRAPE_QUEUE_TIMEOUT", "30"))
+SCRAPE_RETRY_AFTER = int(os.getenv("SCRAPE_RETRY_AFTER", "5"))
+# Comma-separated keys clients may send as X-API-Key; any other key is ignored
+SCRAPE_API_KEYS = {key.strip() for key in os.getenv("SCRAPE_API_KEYS", "").split(",") if key.strip()}
+# Only enable behind a proxy that sets X-Forwarded-For itself, otherwise clients can pick their own identity
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() in ("1", "true", "yes")
+
+def client_identity(headers, client_host: Optional[str]) -> str:
+    """
+    Key for the per-client quota: the X-API-Key header if it is one of SCRAPE_API_KEYS, else
+    the first X-Forwarded-For address when TRUST_FORWARDED_FOR is set, else the peer address.
+    Behind a proxy without either, all callers share the proxy's address and therefore one quota.
+    """
+    api_key = headers.get("x-api-key")
+    if api_key and api_key in SCRAPE_API_KEYS:
+        return "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    if TRUST_FORWARDED_FOR:
+        forwarded_for = headers.get("x-forwarded-for")
+        if forwarded_for:
+            return forwarded_for.split(",")[0].strip()
+    return client_host or "unknown"
+
+class AdmissionRejected(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """
+    Bounded concurrency budget and wait queue for cold scrapes.
+
+    At most `max_concurrent` scrapes run at once and at most `max_queue` wait for a slot.
+    Each client may have `per_client_limit` scrapes running or queued. Requests over these
+    limits are rejected straight away (503 when the queue is full, 429 over the client quota)
+    instead of tying up a worker and a DB connection.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = SCRAPE_MAX_CONCURRENCY,
+        max_queue: int = SCRAPE_MAX_QUEUE,
+        per_client_limit: int = SCRAPE_PER_CLIENT_LIMIT,
+        queue_timeout: float = SCRAPE_QUEUE_TIMEOUT,
+        retry_after: int = SCRAPE_RETRY_AFTER,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.per_client_limit = per_client_limit
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted_total = 0
+        self.rejected_queue_full = 0
+        self.rejected_client_quota = 0
+        self.rejected_queue_timeout = 0
+        self._per_client = Counter()
+        # Created on first use so it binds to the running event loop
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted_total": self.admitted_total,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_client_quota": self.rejected_client_quota,
+            "rejected_queue_timeout": self.rejected_queue_timeout,
+        }
+
+    @asynccontextmanager
+    async def admit(self, client_id: str):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+
+        if self._per_client[client_id] >= self.per_client_limit:
+            self.rejected_client_quota += 1
+            raise AdmissionRejected(429, "Too many scrape requests from this client", self.retry_after)
+        if self.in_flight + self.queued >= self.max_concurrent + self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(503, "Scrape queue is full, try again later", self.retry_after)
+
+        self._per_client[client_id] += 1
+        try:
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected_queue_timeout += 1
+                raise AdmissionRejected(503, "Timed out waiting for a scrape slot", self.retry_after)
+            finally:
+                self.queued -= 1
+
+            self.in_flight += 1
+            self.admitted_total += 1
+            try:
+                yield
+            finally:
+                self.in_flight -= 1
+                self._slots.release()
+        finally:
+            self._per_client[client_id] -= 1
+            if not self._per_client[client_id]:
+                del self._per_client[client_id]
+
+scrape_admission = AdmissionController()
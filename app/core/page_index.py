@@ -0,0 +1,282 @@
+# app/core/page_index.py
+import os
+import sys
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+PAGE_INDEX_ENABLED = os.getenv("PAGE_INDEX_ENABLED", "false").lower() in ("1", "true", "yes")
+PAGE_INDEX_RESYNC_SECONDS = float(os.getenv("PAGE_INDEX_RESYNC_SECONDS", "300"))
+
+# Columns the /pages filters and ordering need; the rows themselves are loaded from the database by id
+INDEX_FIELDS = ("id", "name", "industry", "followers_count")
+
+# Rows per step when scanning in id order; a page of results usually comes from the first chunk
+QUERY_CHUNK = 16384
+
+def trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class PageIndex:
+    """
+    In-process columnar copy of the `pages` table for /pages filtering and pagination.
+
+    Only the filter and sort columns are kept: id and followers_count as NumPy arrays,
+    industry dictionary encoded, and names with a trigram index whose candidates are verified
+    with a substring check, matching `ILIKE '%name%'`. `query` returns the ids of the
+    requested page of results, ordered by id like the SQL path, and the caller loads those
+    rows by primary key. It returns None whenever the index cannot answer (disabled, not
+    loaded, or stale), and the caller falls back to SQL.
+    """
+
+    def __init__(self, enabled: bool = PAGE_INDEX_ENABLED, max_staleness: float = 3 * PAGE_INDEX_RESYNC_SECONDS):
+        self.enabled = enabled
+        self.max_staleness = max_staleness
+        self.last_sync: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._loading_upserts: Optional[List[dict]] = None  # upserts made while `load` builds a snapshot
+        self._reset(capacity=1024)
+
+    def _reset(self, capacity: int):
+        self._size = 0
+        self._ids = np.zeros(capacity, dtype=np.int64)
+        self._followers = np.zeros(capacity, dtype=np.int64)
+        self._has_followers = np.zeros(capacity, dtype=bool)
+        self._industry = np.full(capacity, -1, dtype=np.int32)
+        self._industry_codes: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._trigrams: Dict[str, array] = {}
+        self._positions: Dict[int, int] = {}
+        self._ids_sorted = True
+
+    @property
+    def ready(self) -> bool:
+        return (
+            self.enabled
+            and self.last_sync is not None
+            and time.monotonic() - self.last_sync <= self.max_staleness
+        )
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self):
+        capacity = len(self._ids) * 2
+        for column in ("_ids", "_followers", "_has_followers", "_industry"):
+            old = getattr(self, column)
+            new = np.full(capacity, -1 if column == "_industry" else 0, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, column, new)
+
+    def _set_row(self, position: int, row: dict):
+        followers_count = row.get("followers_count")
+        industry = row.get("industry")
+        name = (row.get("name") or "").casefold()
+
+        self._ids[position] = row["id"]
+        self._has_followers[position] = followers_count is not None
+        self._followers[position] = followers_count or 0
+        if industry is None:
+            self._industry[position] = -1
+        else:
+            self._industry[position] = self._industry_codes.setdefault(industry, len(self._industry_codes))
+
+        # Postings of a renamed page are left behind; candidates are verified against the current name
+        if position == len(self._names) or self._names[position] != name:
+            for trigram in trigrams(name):
+                self._trigrams.setdefault(trigram, array("i")).append(position)
+        if position == len(self._names):
+            self._names.append(name)
+        else:
+            self._names[position] = name
+
+    def _upsert_locked(self, row: dict):
+        position = self._positions.get(row["id"])
+        if position is None:
+            if self._size == len(self._ids):
+                self._grow()
+            position = self._size
+            if self._size and row["id"] < self._ids[self._size - 1]:
+                self._ids_sorted = False
+            self._positions[row["id"]] = position
+            self._size += 1
+        self._set_row(position, row)
+
+    def upsert(self, page) -> None:
+        """Add or update one page (ORM object or dict) after it has been written to the database."""
+        if not self.enabled:
+            return
+        row = page if isinstance(page, dict) else {field: getattr(page, field) for field in INDEX_FIELDS}
+        with self._lock:
+            self._upsert_locked(row)
+            if self._loading_upserts is not None:
+                self._loading_upserts.append(row)
+
+    def load(self, rows: Iterable[dict]) -> None:
+        """
+        Replace the whole index with `rows`. Built aside and swapped in, so queries keep working
+        meanwhile. Upserts made while it is built may be missing from `rows`, so they are
+        applied again after the swap.
+        """
+        with self._lock:
+            self._loading_upserts = []
+        try:
+            fresh = PageIndex(enabled=self.enabled, max_staleness=self.max_staleness)
+            for row in rows:
+                fresh._upsert_locked(row)
+            with self._lock:
+                for attr in ("_size", "_ids", "_followers", "_has_followers", "_industry", "_industry_codes",
+                             "_names", "_trigrams", "_positions", "_ids_sorted"):
+                    setattr(self, attr, getattr(fresh, attr))
+                for row in self._loading_upserts:
+                    self._upsert_locked(row)
+                self.last_sync = time.monotonic()
+        finally:
+            with self._lock:
+                self._loading_upserts = None
+
+    def resync(self, db) -> None:
+        from app.models import Page
+
+        columns = [getattr(Page, field) for field in INDEX_FIELDS]
+        rows = db.query(*columns).order_by(Page.id).yield_per(10000)
+        self.load(dict(zip(INDEX_FIELDS, row)) for row in rows)
+
+    def _name_candidates(self, needle: str) -> Optional[np.ndarray]:
+        """Positions whose name contains the rarest trigram of `needle`, or None if it is too short for the index."""
+        if len(needle) < 3:
+            return None
+        postings = [self._trigrams.get(trigram) for trigram in trigrams(needle)]
+        if any(p is None for p in postings):
+            return np.empty(0, dtype=np.int32)
+        return np.frombuffer(min(postings, key=len), dtype=np.int32)
+
+    def query(self, skip: int = 0, limit: int = 10, name: Optional[str] = None, industry: Optional[str] = None,
+              min_followers: Optional[int] = None, max_followers: Optional[int] = None) -> Optional[List[int]]:
+        if not self.ready:
+            self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            if limit <= 0:
+                return []
+            size = self._size
+            industry_code = None
+            if industry:
+                industry_code = self._industry_codes.get(industry)
+                if industry_code is None:
+                    return []
+            needle = name.casefold() if name else None
+            candidate_mask = None
+            if needle:
+                candidates = self._name_candidates(needle)
+                if candidates is not None:
+                    candidate_mask = np.zeros(size, dtype=bool)
+                    candidate_mask[candidates] = True
+
+            if self._ids_sorted:
+                # Positions are in id order: scan in chunks and stop once the requested page is full
+                chunks = ((lo, min(lo + QUERY_CHUNK, size)) for lo in range(0, size, QUERY_CHUNK))
+            else:
+                chunks = iter([(0, size)])
+
+            result = []
+            matched = 0
+            for lo, hi in chunks:
+                mask = np.ones(hi - lo, dtype=bool)
+                if industry_code is not None:
+                    mask &= self._industry[lo:hi] == industry_code
+                if min_followers is not None:
+                    mask &= self._has_followers[lo:hi] & (self._followers[lo:hi] >= min_followers)
+                if max_followers is not None:
+                    mask &= self._has_followers[lo:hi] & (self._followers[lo:hi] <= max_followers)
+                if candidate_mask is not None:
+                    mask &= candidate_mask[lo:hi]
+
+                positions = np.flatnonzero(mask) + lo
+                if not self._ids_sorted:
+                    positions = positions[np.argsort(self._ids[positions], kind="stable")]
+
+                for p in positions:
+                    if needle and needle not in self._names[p]:
+                        continue
+                    matched += 1
+                    if matched > skip:
+                        result.append(int(self._ids[p]))
+                        if len(result) >= limit:
+                            return result
+            return result
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "pages": self._size,
+            "seconds_since_sync": round(time.monotonic() - self.last_sync, 1) if self.last_sync is not None else None,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def footprint(self) -> dict:
+        """Approximate memory use in bytes, by component, plus a per-million-pages extrapolation."""
+        size = self._size
+        report = {
+            "pages": size,
+            "id_column": self._ids.nbytes,
+            "followers_column": self._followers.nbytes + self._has_followers.nbytes,
+            "industry_column": self._industry.nbytes + sum(sys.getsizeof(k) + 8 for k in self._industry_codes),
+            "names": sys.getsizeof(self._names) + sum(sys.getsizeof(n) for n in self._names),
+            "name_trigrams": sys.getsizeof(self._trigrams) + sum(
+                sys.getsizeof(k) + sys.getsizeof(v) for k, v in self._trigrams.items()
+            ),
+            "positions": sys.getsizeof(self._positions) + 28 * size,
+        }
+        report["total"] = sum(v for k, v in report.items() if k != "pages")
+        report["total_per_million_pages"] = int(report["total"] / size * 1_000_000) if size else 0
+        return report
+
+page_index = PageIndex()
+
+
+if __name__ == '__main__':
+    # Memory footprint report on synthetic pages: python -m app.core.page_index [count]
+    import random
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    industries = [f"Industry {i}" for i in range(150)]
+    words = ["deep", "solv", "cloud", "data", "labs", "tech", "health", "capital", "systems", "studio", "global", "ai"]
+    rng = random.Random(0)
+
+    def synthetic_rows():
+        for i in range(1, count + 1):
+            yield {
+                "id": i, "name": " ".join(rng.choice(words) for _ in range(3)).title(),
+                "industry": rng.choice(industries), "followers_count": rng.randint(0, 5_000_000),
+            }
+
+    index = PageIndex(enabled=True)
+    started = time.perf_counter()
+    index.load(synthetic_rows())
+    print(f"Loaded {count} pages in {time.perf_counter() - started:.1f}s")
+
+    for key, value in index.footprint().items():
+        print(f"{key}: {value / 1_000_000:.1f} MB" if key != "pages" else f"{key}: {value}")
+
+    queries = [
+        {},
+        {"industry": "Industry 7"},
+        {"min_followers": 1000, "max_followers": 5000},
+        {"name": "cloud data", "industry": "Industry 7"},
+        {"name": "ai", "min_followers": 4_000_000},
+    ]
+    for params in queries:
+        started = time.perf_counter()
+        for _ in range(20):
+            index.query(limit=10, **params)
+        print(f"query {params}: {(time.perf_counter() - started) / 20 * 1e6:.0f} us")
@@ -3,24 +3,282 @@ from bs4 import BeautifulSoup
 import re
 import json
 import urllib.parse
+import os
+import codecs
+from html.parser import HTMLParser
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'sec-ch-ua': '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
+    'sec-ch-ua-mobile': '?0',
+    'sec-ch-ua-platform': '"macOS"'
+}
+
+COMPANY_URL = "https://www.linkedin.com/company/{page_id}/"
+FEED_PAGE_URL = "https://www.linkedin.com/company/{page_id}/posts/?feedView=all&start={start}"
+POST_URL = "https://www.linkedin.com/feed/update/{activity_urn}/"
+FEED_MAX_PAGES = int(os.getenv("FEED_MAX_PAGES", "5"))
+# Streaming only stops early for callers that leave out posts; the API scrapes always ask for them
+SCRAPE_STREAMING = os.getenv("SCRAPE_STREAMING", "false").lower() in ("1", "true", "yes")
+MAX_PAGE_BYTES = int(os.getenv("MAX_PAGE_BYTES", str(5 * 1024 * 1024)))
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# Page fields stored in the pages table; streaming stops once all of them have been seen
+REQUIRED_FIELDS = {"name", "description", "website", "profile_picture", "followers_count", "industry", "head_count", "specialities"}
+
+ACTIVITY_URN_RE = re.compile(r'urn:li:(?:activity|share|ugcPost):\d+')
+ACTIVITY_LINK_RE = re.compile(r'activity[-:](\d+)')
+COMMENT_URN_RE = re.compile(r'urn:li:comment:\([^)]*\)')
+
+def parse_count(text):
+    """Parse a LinkedIn counter such as '1,234', '1.2K' or '12 comments' into an int."""
+    if not text:
+        return 0
+    match = re.search(r'(\d[\d,]*(?:\.\d+)?)(?:\s*([KkMm])(?![A-Za-z]))?', text)
+    if not match:
+        return 0
+    try:
+        value = float(match.group(1).replace(',', ''))
+    except ValueError:
+        return 0
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get((match.group(2) or '').lower(), 1)
+    return int(round(value * multiplier))
+
+def activity_id_from_urn(activity_urn):
+    """Numeric part of an activity URN. LinkedIn ids are time ordered, so a larger id is a newer post."""
+    if not activity_urn:
+        return None
+    match = re.search(r'(\d+)$', activity_urn)
+    return int(match.group(1)) if match else None
+
+def extract_activity_urn(article_tag):
+    for attr in ('data-activity-urn', 'data-urn', 'data-id'):
+        value = article_tag.get(attr)
+        if value:
+            match = ACTIVITY_URN_RE.search(value)
+            if match:
+                return match.group(0)
+
+    # Fallback: the share link, e.g. /posts/deepsolv_...-activity-7123456789012345678-abcd
+    for link in article_tag.find_all("a", href=True):
+        match = ACTIVITY_URN_RE.search(urllib.parse.unquote(link['href']))
+        if match:
+            return match.group(0)
+        match = ACTIVITY_LINK_RE.search(link['href'])
+        if match:
+            return f"urn:li:activity:{match.group(1)}"
+    return None
+
+def parse_feed_posts(soup):
+    """Parse the activity cards of a feed page, newest first."""
+    posts_data = []
+    for article_tag in soup.find_all("article", class_="main-feed-activity-card"):
+        content_tag = article_tag.find("p", class_="attributed-text-segment-list__content")
+        # Cards without text (image or video only) have no content; callers skip them
+        post_content = (content_tag.get_text(strip=True) if content_tag else None) or None
+
+        likes_tag = article_tag.find(attrs={"data-test-id": "social-actions__reaction-count"})
+        comments_tag = article_tag.find(attrs={"data-test-id": "social-actions__comments"})
+
+        posts_data.append({
+            "activity_urn": extract_activity_urn(article_tag),
+            "content": post_content,
+            "likes_count": parse_count(likes_tag.get_text(strip=True)) if likes_tag else 0,
+            "comments_count": parse_count(comments_tag.get_text(strip=True)) if comments_tag else 0,
+        })
+    return posts_data
+
+def parse_post_comments(soup):
+    comments_data = []
+    for comment_tag in soup.find_all(["section", "article"], class_="comment"):
+        comment_urn = None
+        for attr in ('data-id', 'data-semaphore-content-urn', 'data-urn'):
+            value = comment_tag.get(attr)
+            match = COMMENT_URN_RE.search(value) if value else None
+            if match:
+                comment_urn = match.group(0)
+                break
+
+        author_tag = comment_tag.find("a", class_="comment__author")
+        author_profile_url = author_tag.get('href') if author_tag else None
+        if author_profile_url:
+            author_profile_url = author_profile_url.split('?')[0]
+
+        text_tag = comment_tag.find(class_="comment__text")
+        if not text_tag:
+            continue
+
+        likes_tag = comment_tag.find(attrs={"data-test-id": "comment__reactions-count"})
+
+        comments_data.append({
+            "comment_urn": comment_urn,
+            "content": text_tag.get_text(strip=True),
+            "likes_count": parse_count(likes_tag.get_text(strip=True)) if likes_tag else 0,
+            "author_name": author_tag.get_text(strip=True) if author_tag else None,
+            "author_profile_url": author_profile_url,
+        })
+    return comments_data
+
+def fetch_feed_page(page_id: str, start: int):
+    """Fetch one page of a company feed, starting at offset `start`. Returns an empty list on failure."""
+    url = FEED_PAGE_URL.format(page_id=page_id, start=start)
+    try:
+        response = requests.get(url, headers=HEADERS)
+        response.raise_for_status()
+        return parse_feed_posts(BeautifulSoup(response.content, 'html.parser'))
+    except requests.exceptions.RequestException as e:
+        print(f"Request Exception for feed page {page_id} (start={start}): {e}")
+        return []
 
-def scrape_linkedin_page(page_id: str):
-    base_url = "https://www.linkedin.com/company/"
-    url = f"{base_url}{page_id}/"
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-        'sec-ch-ua': '"Not A(Brand";v="99", "Google Chrome";v="121", "Chromium";v="121"',
-        'sec-ch-ua-mobile': '?0',
-        'sec-ch-ua-platform': '"macOS"'
+def fetch_post_comments(activity_urn: str):
+    """Fetch the public comments of a single post. Returns an empty list on failure."""
+    url = POST_URL.format(activity_urn=activity_urn)
+    try:
+        response = requests.get(url, headers=HEADERS)
+        response.raise_for_status()
+        return parse_post_comments(BeautifulSoup(response.content, 'html.parser'))
+    except requests.exceptions.RequestException as e:
+        print(f"Request Exception for post {activity_urn}: {e}")
+        return []
+
+class FieldTracker(HTMLParser):
+    """
+    Watches a company page as it streams in and records which fields have been seen.
+
+    A field only counts once the source the extraction below would take it from has been read
+    in full. The extraction prefers the first JSON-LD script for name, description, website,
+    profile picture and head count, wherever it sits in the page, so values for those fields
+    from the top card or about-us section only count once that script has been read.
+    """
+
+    ABOUT_US_FIELDS = {
+        "about-us__industry": ("dd", "industry"),
+        "about-us__size": ("dd", "head_count"),
+        "about-us__specialties": ("dd", "specialities"),
+        "about-us__description": ("p", "description"),
     }
+    JSON_LD_FIELDS = {"name", "description", "website", "profile_picture", "head_count"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.resolved = set()
+        self.employees_done = False
+        self._json_ld_seen = False
+        self._json_ld_read = False
+        self._json_ld = None
+        self._meta_seen = False
+        self._fallbacks = set()  # JSON-LD fields seen elsewhere before the JSON-LD was read
+        self._pending = None  # (tag, field) resolved at the tag's end
+        self._employees_depth = 0
+
+    def done(self, include_posts: bool, include_employees: bool) -> bool:
+        if include_posts or not REQUIRED_FIELDS <= self.resolved:
+            return False
+        return self.employees_done or not include_employees
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        test_id = attrs.get('data-test-id')
+
+        if tag == 'script' and attrs.get('type') == 'application/ld+json' and not self._json_ld_seen:
+            self._json_ld_seen = True
+            self._json_ld = []
+        elif tag == 'meta' and attrs.get('name') == 'description' and not self._meta_seen:
+            self._meta_seen = True
+            if re.search(r'(\d+,?\d*)\s+followers', attrs.get('content') or ''):
+                self.resolved.add('followers_count')
+        elif tag == 'img' and 'top-card-layout__entity-image' in classes and attrs.get('data-delayed-url'):
+            self._resolve_fallback('profile_picture')
+        elif tag == 'h1' and 'top-card-layout__title' in classes:
+            self._pending = (tag, 'name')
+        elif tag == 'a' and attrs.get('aria-describedby') == 'websiteLinkDescription' and attrs.get('href'):
+            self._pending = (tag, 'website')
+        elif test_id in self.ABOUT_US_FIELDS and self.ABOUT_US_FIELDS[test_id][0] == tag:
+            self._pending = self.ABOUT_US_FIELDS[test_id]
+        elif tag == 'section' and (self._employees_depth or test_id == 'employees-at'):
+            self._employees_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'script' and self._json_ld is not None:
+            self._resolve_json_ld(''.join(self._json_ld))
+            self._json_ld = None
+            self._json_ld_read = True
+            self.resolved |= self._fallbacks
+        elif self._pending and self._pending[0] == tag:
+            self._resolve_fallback(self._pending[1])
+            self._pending = None
+        elif tag == 'section' and self._employees_depth:
+            self._employees_depth -= 1
+            if not self._employees_depth:
+                self.employees_done = True
+
+    def _resolve_fallback(self, field):
+        if field in self.JSON_LD_FIELDS and not self._json_ld_read:
+            self._fallbacks.add(field)
+        else:
+            self.resolved.add(field)
+
+    def handle_data(self, data):
+        if self._json_ld is not None:
+            self._json_ld.append(data)
+
+    def _resolve_json_ld(self, text):
+        try:
+            json_data = json.loads(text)
+        except json.JSONDecodeError:
+            return
+        if not isinstance(json_data, dict) or json_data.get('@type') != 'Organization':
+            return
+        for key, field in (('name', 'name'), ('description', 'description'), ('sameAs', 'website')):
+            if json_data.get(key):
+                self.resolved.add(field)
+        if isinstance(json_data.get('logo'), dict) and json_data['logo'].get('contentUrl'):
+            self.resolved.add('profile_picture')
+        if isinstance(json_data.get('numberOfEmployees'), dict) and 'value' in json_data['numberOfEmployees']:
+            self.resolved.add('head_count')
+
+def stream_page_html(url: str, include_posts: bool = True, include_employees: bool = True,
+                     max_bytes: int = MAX_PAGE_BYTES, chunk_size: int = STREAM_CHUNK_SIZE) -> bytes:
+    """
+    Download a page in chunks, stopping once every wanted field has been seen or at `max_bytes`.
+    Posts can appear anywhere in the feed, so asking for them means reading up to the cap.
+    """
+    tracker = FieldTracker()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    chunks, received = [], 0
+
+    with requests.get(url, headers=HEADERS, stream=True) as response:
+        response.raise_for_status()
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if received + len(chunk) > max_bytes:
+                chunks.append(chunk[:max_bytes - received])
+                print(f"Page {url} is larger than {max_bytes} bytes, only the first {max_bytes} are parsed")
+                break
+            chunks.append(chunk)
+            received += len(chunk)
+            if include_posts:
+                continue  # nothing to stop for, skip the tracking work
+            tracker.feed(decoder.decode(chunk))
+            if tracker.done(include_posts, include_employees):
+                break
+
+    return b''.join(chunks)
+
+def scrape_linkedin_page(page_id: str, include_posts: bool = True, include_employees: bool = True, stream: bool = SCRAPE_STREAMING):
+    url = COMPANY_URL.format(page_id=page_id)
     page_data = {}
 
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        if stream:
+            html = stream_page_html(url, include_posts=include_posts, include_employees=include_employees)
+        else:
+            response = requests.get(url, headers=HEADERS)
+            response.raise_for_status()
+            html = response.content
+        soup = BeautifulSoup(html, 'html.parser')
 
         canonical_link = soup.find('link', rel='canonical')
         if canonical_link:
@@ -164,19 +422,11 @@ def scrape_linkedin_page(page_id: str):
              specialities_tag = soup.find("dd", attrs={"data-test-id": "about-us__specialties"})
              page_data['specialities'] = specialities_tag.text.strip() if specialities_tag else None
         
-        posts_data = []
-        article_tags = soup.find_all("article", class_="main-feed-activity-card")
-        for article_tag in article_tags[:3]:
-            content_tag = article_tag.find("p", class_="attributed-text-segment-list__content")
-            if content_tag:
-                post_content = content_tag.get_text(strip=True)
-            else:
-                post_content = "No content found"
-            posts_data.append({"content": post_content})
-        page_data['posts'] = posts_data
+        # First page of the feed; later pages are fetched by the service with fetch_feed_page
+        page_data['posts'] = parse_feed_posts(soup) if include_posts else []
 
         employees_data = []
-        employees_section = soup.find("section", attrs={"data-test-id": "employees-at"}) 
+        employees_section = soup.find("section", attrs={"data-test-id": "employees-at"}) if include_employees else None
         if employees_section:
             employee_list_items = employees_section.find_all("li")
             for emp_li in employee_list_items[:3]:
@@ -0,0 +1,321 @@
+# app/core/write_behind.py
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Optional
+
+from sqlalchemy.exc import OperationalError
+
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "false").lower() in ("1", "true", "yes")
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "50"))
+WRITE_BEHIND_FLUSH_MS = int(os.getenv("WRITE_BEHIND_FLUSH_MS", "200"))
+WRITE_BEHIND_BUFFER_SIZE = int(os.getenv("WRITE_BEHIND_BUFFER_SIZE", "500"))
+WRITE_BEHIND_SUBMIT_TIMEOUT = float(os.getenv("WRITE_BEHIND_SUBMIT_TIMEOUT", "30"))
+WRITE_BEHIND_RESULT_TIMEOUT = float(os.getenv("WRITE_BEHIND_RESULT_TIMEOUT", "60"))
+# memory: buffered records are lost if the process dies before they are flushed
+# journal: records are appended to a local journal first and replayed on restart (survives a process crash)
+# journal_fsync: like journal, but each append is fsynced (also survives an OS crash or power loss)
+WRITE_BEHIND_DURABILITY = os.getenv("WRITE_BEHIND_DURABILITY", "memory")
+WRITE_BEHIND_JOURNAL_DIR = os.getenv("WRITE_BEHIND_JOURNAL_DIR", "./write_behind_journal")
+# Journalled records still failing after this many replays are moved to dead-letter.jsonl in the journal dir
+WRITE_BEHIND_MAX_REPLAYS = int(os.getenv("WRITE_BEHIND_MAX_REPLAYS", "3"))
+
+DURABILITY_MODES = ("memory", "journal", "journal_fsync")
+
+class WriteBehindUnavailable(Exception):
+    """The write-behind stage cannot take or commit a record right now; the caller may retry later."""
+
+class WriteBehindFull(WriteBehindUnavailable):
+    pass
+
+class _Record:
+    __slots__ = ("page_id", "scraped_data", "replays", "future", "enqueued_at")
+
+    def __init__(self, page_id: str, scraped_data: dict, replays: int = 0):
+        self.page_id = page_id
+        self.scraped_data = scraped_data
+        self.replays = replays
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+    def to_json(self) -> str:
+        entry = {"page_id": self.page_id, "scraped_data": self.scraped_data}
+        if self.replays:
+            entry["replays"] = self.replays
+        return json.dumps(entry)
+
+class WriteBehindWriter:
+    """
+    Buffers scrape results and lets a single writer thread persist them as group commits.
+
+    `submit` adds a record to a bounded buffer and returns a Future that resolves to the
+    page's primary key (or None if that record failed) once its batch has committed. The
+    writer flushes everything buffered as one transaction when `batch_size` records are
+    waiting or the oldest has waited `flush_interval_ms`. If a batch fails, its records are
+    retried one transaction each, so one bad record does not fail the others. When the
+    buffer is full, `submit` blocks for up to `submit_timeout` seconds and then raises
+    WriteBehindFull. If the writer thread dies, the records it had not committed fail with
+    WriteBehindUnavailable and the writer stops, so callers can fall back to writing directly.
+
+    With a journal durability mode, records are appended to a journal before they are
+    buffered. The journal is rotated into a segment when a batch is taken and the segment
+    is deleted once that batch commits, so `start` can replay whatever was not committed.
+    Replay deletes each journal file once its records have committed. A record that still
+    fails after `max_replays` replays is moved to dead-letter.jsonl instead of blocking the
+    replay on every start.
+    """
+
+    def __init__(
+        self,
+        persist: Callable,
+        session_factory: Callable,
+        after_commit: Optional[Callable] = None,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_interval_ms: int = WRITE_BEHIND_FLUSH_MS,
+        max_buffer: int = WRITE_BEHIND_BUFFER_SIZE,
+        submit_timeout: float = WRITE_BEHIND_SUBMIT_TIMEOUT,
+        durability: str = WRITE_BEHIND_DURABILITY,
+        journal_dir: str = WRITE_BEHIND_JOURNAL_DIR,
+        max_replays: int = WRITE_BEHIND_MAX_REPLAYS,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown write-behind durability {durability!r}, expected one of {DURABILITY_MODES}")
+        self.persist = persist
+        self.session_factory = session_factory
+        self.after_commit = after_commit
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_buffer = max_buffer
+        self.submit_timeout = submit_timeout
+        self.durability = durability
+        self.journal_dir = journal_dir
+        self.max_replays = max_replays
+
+        self.flushed_batches = 0
+        self.flushed_records = 0
+        self.failed_records = 0
+        self.backpressure_waits = 0
+        self.rejected_full = 0
+        self.dead_lettered = 0
+
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self._journal = None
+        self._segment_seq = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._closing
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "durability": self.durability,
+            "buffered": len(self._buffer),
+            "max_buffer": self.max_buffer,
+            "flushed_batches": self.flushed_batches,
+            "flushed_records": self.flushed_records,
+            "failed_records": self.failed_records,
+            "backpressure_waits": self.backpressure_waits,
+            "rejected_full": self.rejected_full,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._closing = False
+        if self.durability != "memory":
+            os.makedirs(self.journal_dir, exist_ok=True)
+            self._replay_journal()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Flush everything still buffered and stop the writer thread."""
+        if self._thread is None:
+            return
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        self._thread = None
+        self._close_journal()
+
+    def submit(self, page_id: str, scraped_data: dict) -> Future:
+        record = _Record(page_id, scraped_data)
+        deadline = time.monotonic() + self.submit_timeout
+        with self._cond:
+            if len(self._buffer) >= self.max_buffer:
+                self.backpressure_waits += 1
+            while len(self._buffer) >= self.max_buffer and not self._closing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.rejected_full += 1
+                    raise WriteBehindFull(f"Write-behind buffer is full ({self.max_buffer} records)")
+                self._cond.wait(remaining)
+            if self._closing or self._thread is None:
+                raise WriteBehindUnavailable("Write-behind writer is not running")
+
+            self._append_to_journal(record)
+            self._buffer.append(record)
+            if len(self._buffer) == 1 or len(self._buffer) >= self.batch_size:
+                self._cond.notify_all()
+        return record.future
+
+    def _run(self):
+        batch = []
+        try:
+            while True:
+                with self._cond:
+                    while not self._closing and len(self._buffer) < self.batch_size:
+                        if self._buffer:
+                            remaining = self._buffer[0].enqueued_at + self.flush_interval - time.monotonic()
+                            if remaining <= 0:
+                                break
+                            self._cond.wait(remaining)
+                        else:
+                            self._cond.wait()
+                    if not self._buffer:
+                        return  # closing and fully flushed
+                    batch = list(self._buffer)
+                    self._buffer.clear()
+                    segment = self._rotate_journal()
+                    self._cond.notify_all()  # wake submitters waiting for space
+
+                if self._flush(batch) and segment:
+                    os.remove(segment)
+        except Exception as e:
+            print(f"Write-behind writer stopped after an unexpected error: {e}")
+            with self._cond:
+                pending = batch + list(self._buffer)
+                self._buffer.clear()
+                self._thread = None
+                self._close_journal()
+                self._cond.notify_all()
+            # Whatever reached the journal is replayed on the next start
+            for record in pending:
+                if not record.future.done():
+                    record.future.set_exception(WriteBehindUnavailable(f"Write-behind writer stopped: {e}"))
+
+    def _flush(self, batch) -> bool:
+        """Persist and commit `batch`. Returns False if records must stay in the journal for a retry."""
+        db = self.session_factory()
+        try:
+            results = []
+            for record in batch:
+                db_page = self.persist(db, record.page_id, record.scraped_data)
+                results.append((record, db_page, db_page.id))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            db.close()
+            if len(batch) > 1:
+                # Find the bad record: retry each one in its own transaction
+                print(f"Error in write-behind batch of {len(batch)} records, retrying one by one: {e}")
+                return all([self._flush([record]) for record in batch])
+            print(f"Error persisting page_id {batch[0].page_id} in write-behind: {e}")
+            self.failed_records += 1
+            if isinstance(e, OperationalError):
+                # Database unavailable rather than a bad record: keep the journal so it is replayed
+                batch[0].future.set_exception(e)
+                return False
+            batch[0].future.set_result(None)
+            return True
+
+        try:
+            self.flushed_batches += 1
+            self.flushed_records += len(results)
+            for record, db_page, page_pk in results:
+                if self.after_commit:
+                    try:
+                        self.after_commit(db_page)
+                    except Exception as e:
+                        print(f"Error in write-behind after_commit for page_id {record.page_id}: {e}")
+                record.future.set_result(page_pk)
+        finally:
+            db.close()
+        return True
+
+    def _append_to_journal(self, record: _Record):
+        if self.durability == "memory":
+            return
+        if self._journal is None:
+            self._journal = open(os.path.join(self.journal_dir, "current.jsonl"), "a", encoding="utf-8")
+        self._journal.write(record.to_json() + "\n")
+        self._journal.flush()
+        if self.durability == "journal_fsync":
+            os.fsync(self._journal.fileno())
+
+    def _close_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def _rotate_journal(self) -> Optional[str]:
+        """Move the journal holding the batch being flushed aside; new records start a fresh journal."""
+        if self._journal is None:
+            return None
+        self._close_journal()
+        self._segment_seq += 1
+        segment = os.path.join(self.journal_dir, f"segment-{time.time_ns()}-{self._segment_seq}.jsonl")
+        os.replace(os.path.join(self.journal_dir, "current.jsonl"), segment)
+        return segment
+
+    def _replay_journal(self):
+        paths = sorted(glob.glob(os.path.join(self.journal_dir, "segment-*.jsonl")))
+        current = os.path.join(self.journal_dir, "current.jsonl")
+        if os.path.exists(current):
+            paths.append(current)
+
+        for path in paths:
+            records = []
+            with open(path, encoding="utf-8") as journal:
+                for line in journal:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # torn last line from a crash mid-append
+                    records.append(_Record(entry["page_id"], entry["scraped_data"], entry.get("replays", 0)))
+
+            print(f"Replaying {len(records)} write-behind records from {os.path.basename(path)}")
+            for i in range(0, len(records), self.batch_size):
+                self._flush(records[i:i + self.batch_size])
+
+            # Only records that hit an OperationalError are left failed; keep those for the next start
+            failed = [record for record in records if record.future.exception(timeout=0) is not None]
+            for record in failed:
+                record.replays += 1
+            retry = [record for record in failed if record.replays < self.max_replays]
+            dead = [record for record in failed if record.replays >= self.max_replays]
+            if dead:
+                self._dead_letter(dead)
+            if retry:
+                self._rewrite_journal(path, retry)
+            else:
+                os.remove(path)
+            if failed and len(failed) == len(records):
+                return  # nothing committed, the database is probably down; try the rest next start
+
+    def _rewrite_journal(self, path: str, records):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as journal:
+            for record in records:
+                journal.write(record.to_json() + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(tmp_path, path)
+
+    def _dead_letter(self, records):
+        path = os.path.join(self.journal_dir, "dead-letter.jsonl")
+        print(f"Moving {len(records)} write-behind records that keep failing to {path}")
+        with open(path, "a", encoding="utf-8") as dead_letter:
+            for record in records:
+                dead_letter.write(record.to_json() + "\n")
+        self.dead_lettered += len(records)
@@ -1,20 +1,60 @@
 # app/main.py
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
-from app.core.database import engine, Base
-from app.api.endpoints import pages
+import asyncio
+from sqlalchemy import inspect, text
+from app.core.database import engine, Base, SessionLocal
+from app.core.page_index import page_index, PAGE_INDEX_RESYNC_SECONDS
+from app.core.write_behind import WRITE_BEHIND_ENABLED
+from app.services.page_service import page_writer
+from app.api.endpoints import pages, metrics
+
+def add_missing_columns():
+    # create_all does not alter existing tables, so columns added after a table was first created go here
+    page_columns = {column["name"] for column in inspect(engine).get_columns("pages")}
+    if "posts_high_water_mark" not in page_columns:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE pages ADD COLUMN posts_high_water_mark BIGINT"))
 
 def create_tables():
     Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+
+def resync_page_index():
+    db = SessionLocal()
+    try:
+        page_index.resync(db)
+    except Exception as e:
+        print(f"Error resyncing page index: {e}")
+    finally:
+        db.close()
+
+async def resync_page_index_periodically():
+    while True:
+        await asyncio.sleep(PAGE_INDEX_RESYNC_SECONDS)
+        await run_in_threadpool(resync_page_index)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_tables()
+    if WRITE_BEHIND_ENABLED:
+        # Replays any journal left by a crash before serving
+        await run_in_threadpool(page_writer.start)
+    resync_task = None
+    if page_index.enabled:
+        await run_in_threadpool(resync_page_index)
+        resync_task = asyncio.create_task(resync_page_index_periodically())
     yield
+    if resync_task:
+        resync_task.cancel()
+    # Flush buffered scrape results before exiting
+    await run_in_threadpool(page_writer.stop)
 
 app = FastAPI(title="LinkedIn Insights Microservice", lifespan=lifespan)
 
 app.include_router(pages.router)
+app.include_router(metrics.router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,5 +1,5 @@
 # app/models/page.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, func, UniqueConstraint
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, func, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -18,6 +18,7 @@ class Page(Base):
     followers_count = Column(Integer)
     head_count = Column(String(255))
     specialities = Column(Text)
+    posts_high_water_mark = Column(BigInteger) # Newest LinkedIn activity id already ingested
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
 
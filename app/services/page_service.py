@@ -1,9 +1,13 @@
 # app/services/page_service.py
 from sqlalchemy.orm import Session
-from app.models import Page, Post, SocialMediaUser
+from app.models import Page, Post, SocialMediaUser, Comment
 from app.schemas import page as page_schema, post as post_schema, social_media_user as user_schema
-from app.core.scraper import scrape_linkedin_page
-from typing import List, Optional
+from app.core import database
+from app.core.page_index import page_index
+from app.core.write_behind import WriteBehindWriter, WriteBehindUnavailable, WRITE_BEHIND_RESULT_TIMEOUT
+from app.core.scraper import scrape_linkedin_page, fetch_feed_page, fetch_post_comments, activity_id_from_urn, FEED_MAX_PAGES
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import List, Optional, Tuple
 from urllib.parse import urlparse
 import hashlib
 import time
@@ -11,19 +15,18 @@ import time
 def get_page_by_page_id(db: Session, page_id: str) -> Optional[Page]:
     return db.query(Page).filter(Page.page_id == page_id).first()
 
+# create_page and update_page only flush, so several pages can share one transaction
 def create_page(db: Session, page: page_schema.PageCreate) -> Page:
     db_page = Page(**page.dict())
     db.add(db_page)
-    db.commit()
-    db.refresh(db_page)
+    db.flush()
     return db_page
 
 def update_page(db: Session, db_page: Page, page_update: page_schema.PageUpdate) -> Page:
     for key, value in page_update.dict(exclude_unset=True).items():
         setattr(db_page, key, value)
     db.add(db_page)
-    db.commit()
-    db.refresh(db_page)
+    db.flush()
     return db_page
 
 def is_valid_url(url: str) -> bool:
@@ -54,131 +57,318 @@ def clean_url(url: str) -> Optional[str]:
             pass
     return url
 
-def scrape_and_save_page(db: Session, page_id: str) -> Optional[Page]:
-    try:
-        # Get data from the scraper
-        scraped_data = scrape_linkedin_page(page_id)
-        if not scraped_data:
-            print(f"No data returned from scraper for page_id: {page_id}")
-            return None
+def get_default_author(db: Session, db_page: Page) -> SocialMediaUser:
+    author_user = db.query(SocialMediaUser).filter(
+        SocialMediaUser.page_id == db_page.id,
+        SocialMediaUser.name == "Default Page Author"
+    ).first()
+
+    if not author_user:
+        author_user = SocialMediaUser(
+            linkedin_id=generate_unique_id("author", db_page.id, "default"),
+            name="Default Page Author",
+            page_id=db_page.id
+        )
+        db.add(author_user)
+        db.flush()
+    return author_user
+
+def get_or_create_commenter(db: Session, name: Optional[str], profile_url: Optional[str]) -> SocialMediaUser:
+    commenter_id = generate_unique_id("user", profile_url or name or "unknown")
+    commenter = db.query(SocialMediaUser).filter(SocialMediaUser.linkedin_id == commenter_id).first()
+    if not commenter:
+        # Commenters are not employees, so they are not linked to a page
+        commenter = SocialMediaUser(
+            linkedin_id=commenter_id,
+            name=name or "LinkedIn Member",
+            profile_url=clean_url(profile_url)
+        )
+        db.add(commenter)
+        db.flush()
+    return commenter
+
+def ingest_post_comments(db: Session, db_post: Post, comments: List[dict]) -> int:
+    """Store the comments of a post that are not in the database yet. Returns the number added."""
+    added = 0
+    seen_ids = set()
+    for comment_data in comments:
+        if not comment_data.get('content'):
+            continue
+
+        comment_id = comment_data.get('comment_urn') or generate_unique_id(
+            "comment", db_post.linkedin_id, comment_data.get('author_profile_url') or '', comment_data['content'][:50]
+        )
+        if comment_id in seen_ids or db.query(Comment.id).filter(Comment.linkedin_id == comment_id).first():
+            continue
+        seen_ids.add(comment_id)
 
-        # Clean URLs but don't validate them - let the schema handle validation
-        url = clean_url(scraped_data.get('url'))
-        profile_picture = clean_url(scraped_data.get('profile_picture'))
-        website = clean_url(scraped_data.get('website'))
-
-        # Prepare page data for database with default values for nullable fields
-        page_data = {
-            'page_id': page_id,
-            'linkedin_id': page_id,
-            'name': scraped_data.get('name') or f"Company {page_id}",
-            'url': url,
-            'profile_picture': profile_picture,
-            'description': scraped_data.get('description'),
-            'website': website,
-            'industry': scraped_data.get('industry'),
-            'followers_count': scraped_data.get('followers_count', 0),
-            'head_count': scraped_data.get('head_count'),
-            'specialities': scraped_data.get('specialities')
-        }
-
-        # Check if page exists
-        db_page = get_page_by_page_id(db, page_id)
-        if db_page:
-            # Page exists, update it
-            page_update_schema = page_schema.PageUpdate(**page_data)
-            db_page = update_page(db, db_page, page_update_schema)
-        else:
-            # Page does not exist, create new
-            page_create_schema = page_schema.PageCreate(**page_data)
-            db_page = create_page(db, page_create_schema)
-
-        # Handle posts
-        if scraped_data.get('posts'):
-            for idx, post_data in enumerate(scraped_data['posts']):
-                if not post_data.get('content'):
+        commenter = get_or_create_commenter(db, comment_data.get('author_name'), comment_data.get('author_profile_url'))
+        db.add(Comment(
+            linkedin_id=comment_id,
+            content=comment_data['content'],
+            likes_count=comment_data.get('likes_count', 0),
+            post_id=db_post.id,
+            author_user_id=commenter.id
+        ))
+        added += 1
+    return added
+
+def get_legacy_post(db: Session, db_page: Page, content: str) -> Optional[Post]:
+    """Find a post of the page stored under a content-hash id ("post-<md5>") rather than its URN."""
+    return db.query(Post).filter(
+        Post.page_id == db_page.id,
+        Post.linkedin_id.like("post-%"),
+        Post.content == content
+    ).first()
+
+def collect_new_feed_posts(page_id: str, high_water_mark: Optional[int], first_page_posts: List[dict], max_pages: int = FEED_MAX_PAGES) -> Tuple[List[dict], bool]:
+    """
+    Walk the feed of a page, newest first, and return the posts newer than `high_water_mark`,
+    each with its fetched `comments`, and whether the walk is complete. This is the network
+    half of feed ingestion; it does not touch the database.
+
+    Stops at the first post that is not newer than the mark, so a refresh only fetches what was
+    published since the last one. The very first card of the feed is exempt from that stop,
+    since a company can pin an older post there; it is skipped instead.
+
+    The walk is complete when it reached the mark or the end of the feed. When it was cut off
+    by `max_pages` instead, there may be new posts older than the ones returned, so the mark
+    must not be moved past them.
+    """
+    high_water_mark = high_water_mark or 0
+    new_posts = []
+
+    posts, start, pages_fetched = first_page_posts, 0, 1
+    while posts:
+        reached_high_water_mark = False
+        for position, post_data in enumerate(posts, start=start):
+            activity_urn = post_data.get('activity_urn')
+            activity_id = activity_id_from_urn(activity_urn)
+            if activity_id is not None and activity_id <= high_water_mark:
+                if position == 0:
                     continue
+                reached_high_water_mark = True
+                break
+
+            # Cards without text (image or video only) are not stored
+            if not post_data.get('content'):
+                continue
+
+            post_data = dict(post_data)
+            if activity_urn and post_data.get('comments_count'):
+                post_data['comments'] = fetch_post_comments(activity_urn)
+            new_posts.append(post_data)
+
+        if reached_high_water_mark:
+            return new_posts, True
+        if pages_fetched >= max_pages:
+            return new_posts, False
+        start += len(posts)
+        posts = fetch_feed_page(page_id, start)
+        pages_fetched += 1
+
+    return new_posts, True
+
+def store_feed_posts(db: Session, db_page: Page, posts: List[dict], advance_high_water_mark: bool = True) -> int:
+    """
+    Store posts returned by collect_new_feed_posts and their comments. Returns the number of
+    posts added. Does not commit.
+
+    The page's high-water mark is advanced to the newest stored post only if
+    `advance_high_water_mark` is set, i.e. the walk that collected `posts` was complete.
+    """
+    high_water_mark = db_page.posts_high_water_mark or 0
+    newest_activity_id = high_water_mark
+    author_user = None
+    added = 0
+
+    for post_data in posts:
+        content = post_data.get('content')
+        if not content:
+            continue
+
+        activity_urn = post_data.get('activity_urn')
+        activity_id = activity_id_from_urn(activity_urn)
+        if activity_id is not None:
+            newest_activity_id = max(newest_activity_id, activity_id)
+
+        # Prefer the activity URN; hash the content only for cards without one
+        post_id = activity_urn or generate_unique_id("post", db_page.id, content[:50])
+        if db.query(Post.id).filter(Post.linkedin_id == post_id).first():
+            continue
+
+        if activity_urn:
+            legacy_post = get_legacy_post(db, db_page, content)
+            if legacy_post:
+                # Stored before posts were keyed by URN; re-key it instead of inserting a duplicate
+                legacy_post.linkedin_id = activity_urn
+                db.flush()
+                continue
+
+        if author_user is None:
+            author_user = get_default_author(db, db_page)
+
+        post_create = post_schema.PostCreate(
+            linkedin_id=post_id,
+            content=content,
+            likes_count=post_data.get('likes_count', 0),
+            comments_count=post_data.get('comments_count', 0),
+            page_id=db_page.id,
+            author_user_id=author_user.id
+        )
+        db_post = Post(**post_create.dict())
+        db.add(db_post)
+        db.flush()
+        added += 1
+
+        if post_data.get('comments'):
+            ingest_post_comments(db, db_post, post_data['comments'])
+
+    if advance_high_water_mark and newest_activity_id > high_water_mark:
+        db_page.posts_high_water_mark = newest_activity_id
+    return added
 
-                # Generate a unique post ID
-                post_id = generate_unique_id("post", db_page.id, post_data.get('content', '')[:50], idx)
-                
-                # Check if post already exists
-                existing_post = db.query(Post).filter(Post.linkedin_id == post_id).first()
-                if not existing_post and post_data.get('content'):
-                    # Create a default author if none exists
-                    author_user = db.query(SocialMediaUser).filter(
-                        SocialMediaUser.page_id == db_page.id,
-                        SocialMediaUser.name == "Default Page Author"
-                    ).first()
-                    
-                    if not author_user:
-                        author_user = SocialMediaUser(
-                            linkedin_id=generate_unique_id("author", db_page.id, "default"),
-                            name="Default Page Author",
-                            page_id=db_page.id
-                        )
-                        db.add(author_user)
-                        db.flush()
-
-                    # Create the post
-                    post_create = post_schema.PostCreate(
-                        linkedin_id=post_id,
-                        content=post_data['content'],
-                        likes_count=post_data.get('likes_count', 0),
-                        comments_count=post_data.get('comments_count', 0),
-                        page_id=db_page.id,
-                        author_user_id=author_user.id
-                    )
-                    db_post = Post(**post_create.dict())
-                    db.add(db_post)
-
-        # Handle employees
-        if scraped_data.get('employees'):
-            for employee_data in scraped_data['employees']:
-                try:
-                    name = employee_data.get('name')
-                    if not name:
-                        continue
-
-                    profile_url = clean_url(employee_data.get('profile_url'))
-                    profile_picture = clean_url(employee_data.get('profile_picture'))
-
-                    # Generate a unique employee ID
-                    employee_id = generate_unique_id("employee", db_page.id, name, profile_url or '')
-
-                    # Check if employee already exists
-                    existing_employee = db.query(SocialMediaUser).filter(
-                        SocialMediaUser.linkedin_id == employee_id,
-                        SocialMediaUser.page_id == db_page.id
-                    ).first()
-
-                    if not existing_employee:
-                        # Create employee data
-                        employee_data_clean = {
-                            'linkedin_id': employee_id,
-                            'name': name,
-                            'page_id': db_page.id,
-                            'profile_url': profile_url,
-                            'profile_picture': profile_picture
-                        }
-
-                        # Create the employee
-                        db_employee = SocialMediaUser(**employee_data_clean)
-                        db.add(db_employee)
-
-                except Exception as e:
-                    print(f"Error creating employee {employee_data.get('name')}: {e}")
+def ingest_page_feed(db: Session, db_page: Page, first_page_posts: List[dict], max_pages: int = FEED_MAX_PAGES) -> int:
+    """Ingest new posts (and their comments) of a page. Returns the number of posts added. Does not commit."""
+    new_posts, complete = collect_new_feed_posts(db_page.page_id, db_page.posts_high_water_mark, first_page_posts, max_pages=max_pages)
+    return store_feed_posts(db, db_page, new_posts, advance_high_water_mark=complete)
+
+def scrape_page(db: Session, page_id: str, include_posts: bool = True, include_employees: bool = True) -> Optional[dict]:
+    """
+    Network half of scrape_and_save_page: scrape the page and walk its feed down to the stored
+    high-water mark. The result is ready for persist_scraped_page.
+    """
+    # Leaving out posts and employees lets the scraper stop downloading early
+    scraped_data = scrape_linkedin_page(page_id, include_posts=include_posts, include_employees=include_employees)
+    if not scraped_data:
+        print(f"No data returned from scraper for page_id: {page_id}")
+        return None
+
+    db_page = get_page_by_page_id(db, page_id)
+    high_water_mark = db_page.posts_high_water_mark if db_page else None
+    scraped_data['posts'], scraped_data['feed_complete'] = collect_new_feed_posts(page_id, high_water_mark, scraped_data.get('posts') or [])
+    return scraped_data
+
+def persist_scraped_page(db: Session, page_id: str, scraped_data: dict) -> Page:
+    """Write the output of scrape_page to the session. Does not commit, so many pages can share a transaction."""
+    # Clean URLs but don't validate them - let the schema handle validation
+    url = clean_url(scraped_data.get('url'))
+    profile_picture = clean_url(scraped_data.get('profile_picture'))
+    website = clean_url(scraped_data.get('website'))
+
+    # Prepare page data for database with default values for nullable fields
+    page_data = {
+        'page_id': page_id,
+        'linkedin_id': page_id,
+        'name': scraped_data.get('name') or f"Company {page_id}",
+        'url': url,
+        'profile_picture': profile_picture,
+        'description': scraped_data.get('description'),
+        'website': website,
+        'industry': scraped_data.get('industry'),
+        'followers_count': scraped_data.get('followers_count', 0),
+        'head_count': scraped_data.get('head_count'),
+        'specialities': scraped_data.get('specialities')
+    }
+
+    # Check if page exists
+    db_page = get_page_by_page_id(db, page_id)
+    if db_page:
+        # Page exists, update it
+        db_page = update_page(db, db_page, page_schema.PageUpdate(**page_data))
+    else:
+        # Page does not exist, create new
+        db_page = create_page(db, page_schema.PageCreate(**page_data))
+
+    # Handle posts and their comments
+    store_feed_posts(db, db_page, scraped_data.get('posts') or [], advance_high_water_mark=scraped_data.get('feed_complete', False))
+
+    # Handle employees
+    if scraped_data.get('employees'):
+        for employee_data in scraped_data['employees']:
+            try:
+                name = employee_data.get('name')
+                if not name:
                     continue
 
+                profile_url = clean_url(employee_data.get('profile_url'))
+                profile_picture = clean_url(employee_data.get('profile_picture'))
+
+                # Generate a unique employee ID
+                employee_id = generate_unique_id("employee", db_page.id, name, profile_url or '')
+
+                # Check if employee already exists
+                existing_employee = db.query(SocialMediaUser).filter(
+                    SocialMediaUser.linkedin_id == employee_id,
+                    SocialMediaUser.page_id == db_page.id
+                ).first()
+
+                if not existing_employee:
+                    # Create employee data
+                    employee_data_clean = {
+                        'linkedin_id': employee_id,
+                        'name': name,
+                        'page_id': db_page.id,
+                        'profile_url': profile_url,
+                        'profile_picture': profile_picture
+                    }
+
+                    # Create the employee
+                    db_employee = SocialMediaUser(**employee_data_clean)
+                    db.add(db_employee)
+
+            except Exception as e:
+                print(f"Error creating employee {employee_data.get('name')}: {e}")
+                continue
+
+    return db_page
+
+# Write-behind stage for scrape results; started by the app's lifespan when WRITE_BEHIND_ENABLED is set
+page_writer = WriteBehindWriter(
+    persist=persist_scraped_page,
+    session_factory=lambda: database.SessionLocal(),
+    after_commit=page_index.upsert,
+)
+
+def scrape_and_save_page(db: Session, page_id: str, include_posts: bool = True, include_employees: bool = True) -> Optional[Page]:
+    try:
+        scraped_data = scrape_page(db, page_id, include_posts=include_posts, include_employees=include_employees)
+        if not scraped_data:
+            return None
+
+        if page_writer.running:
+            # Group commit: wait for the write-behind stage to commit this page with others
+            try:
+                page_pk = page_writer.submit(page_id, scraped_data).result(timeout=WRITE_BEHIND_RESULT_TIMEOUT)
+            except FutureTimeoutError:
+                raise WriteBehindUnavailable(f"Write-behind did not commit page_id {page_id} within {WRITE_BEHIND_RESULT_TIMEOUT}s")
+            db.expire_all()
+            return db.get(Page, page_pk) if page_pk else None
+
+        db_page = persist_scraped_page(db, page_id, scraped_data)
         db.commit()
+        page_index.upsert(db_page)
         return db_page
 
+    except WriteBehindUnavailable as e:
+        # Overload rather than a missing page; the endpoint answers 503 so the client retries
+        print(f"Write-behind unavailable for page_id {page_id}: {e}")
+        db.rollback()
+        raise
     except Exception as e:
         print(f"Error in scrape_and_save_page for page_id {page_id}: {e}")
         db.rollback()
         return None
 
 def get_paged_pages(db: Session, skip: int = 0, limit: int = 10, name: Optional[str] = None, industry: Optional[str] = None, min_followers: Optional[int] = None, max_followers: Optional[int] = None) -> List[Page]:
+    # Filtered by the in-memory index when it is enabled and fresh, otherwise by SQL
+    page_ids = page_index.query(skip=skip, limit=limit, name=name, industry=industry, min_followers=min_followers, max_followers=max_followers)
+    if page_ids is not None:
+        if not page_ids:
+            return []
+        pages = {page.id: page for page in db.query(Page).filter(Page.id.in_(page_ids))}
+        return [pages[pk] for pk in page_ids if pk in pages]
+
     query = db.query(Page)
 
     if name:
@@ -194,7 +384,7 @@ def get_paged_pages(db: Session, skip: int = 0, limit: int = 10, name: Optional[
     elif max_followers is not None:
         query = query.filter(Page.followers_count <= max_followers)
 
-    return query.offset(skip).limit(limit).all()
+    return query.order_by(Page.id).offset(skip).limit(limit).all()
 
 def get_page_employees(db: Session, page_id: str, skip: int = 0, limit: int = 10) -> List[SocialMediaUser]:
     db_page = get_page_by_page_id(db, page_id)
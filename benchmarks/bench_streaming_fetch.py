@@ -0,0 +1,110 @@
+# benchmarks/bench_streaming_fetch.py
+"""
+Bytes transferred and peak memory of full vs streaming scrapes on large fixture pages.
+
+Serves a synthetic company page from a local HTTP server and scrapes it with
+`scrape_linkedin_page` in both modes. Bytes are counted on the client side; on loopback
+the server can push megabytes into socket buffers before an early close is noticed.
+Run from the repository root:
+
+    python -m benchmarks.bench_streaming_fetch [page_mb] [concurrency]
+"""
+import os
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.core import scraper
+
+HEAD = """<html><head>
+<link rel="canonical" href="https://www.linkedin.com/company/fixture/">
+<script type="application/ld+json">{"@type": "Organization", "name": "Fixture Inc", "description": "Fixture company",
+ "sameAs": "https://fixture.example.com", "logo": {"contentUrl": "https://media.example.com/logo.png"},
+ "numberOfEmployees": {"value": 250}}</script>
+<meta name="description" content="Fixture Inc | 12,345 followers on LinkedIn">
+</head><body>
+<h1 class="top-card-layout__title">Fixture Inc</h1>
+<dd data-test-id="about-us__industry">Software Development</dd>
+<dd data-test-id="about-us__size">201-500 employees</dd>
+<dd data-test-id="about-us__specialties">Benchmarks, Fixtures</dd>
+<section data-test-id="employees-at"><ul>
+""" + "".join(
+    f'<li><a class="base-card" href="/in/person-{i}"><h3 class="base-main-card__title">Person {i}</h3>'
+    f'<h4 class="base-main-card__subtitle">Engineer</h4></a></li>' for i in range(3)
+) + "</ul></section>\n"
+
+POST = """<article class="main-feed-activity-card" data-activity-urn="urn:li:activity:{id}">
+<p class="attributed-text-segment-list__content">{text}</p>
+<span data-test-id="social-actions__reaction-count">1,024</span></article>
+"""
+
+def build_page(size_mb: float) -> bytes:
+    posts, size, i = [], len(HEAD), 0
+    while size < size_mb * 1024 * 1024:
+        post = POST.format(id=7200000000000000000 - i, text="Lorem ipsum dolor sit amet. " * 40)
+        posts.append(post)
+        size += len(post)
+        i += 1
+    return (HEAD + "".join(posts) + "</body></html>").encode()
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    body = b""
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        try:
+            for i in range(0, len(self.body), 16 * 1024):
+                self.wfile.write(self.body[i:i + 16 * 1024])
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *args):
+        pass
+
+received = []
+stream_page_html = scraper.stream_page_html
+
+def counting_stream_page_html(*args, **kwargs):
+    html = stream_page_html(*args, **kwargs)
+    received.append(len(html))
+    return html
+
+def run(label: str, concurrency: int, **kwargs):
+    received.clear()
+    tracemalloc.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: scraper.scrape_linkedin_page("fixture", **kwargs), range(concurrency)))
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert all(r and r["industry"] == "Software Development" for r in results)
+    received_per_scrape = sum(received) / concurrency if received else len(FixtureHandler.body)
+    print(f"{label:<34} {received_per_scrape / 1024:>8.0f} KiB received/scrape"
+          f" {peak / concurrency / 1024 / 1024:>8.1f} MiB peak/scrape {elapsed / concurrency * 1000:>8.0f} ms/scrape")
+
+if __name__ == "__main__":
+    page_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 4
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    FixtureHandler.body = build_page(page_mb)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    scraper.COMPANY_URL = f"http://127.0.0.1:{server.server_address[1]}/company/{{page_id}}/"
+    scraper.stream_page_html = counting_stream_page_html
+
+    print(f"Fixture page: {len(FixtureHandler.body) / 1024 / 1024:.1f} MiB, {concurrency} concurrent scrapes")
+    run("full fetch", concurrency, stream=False)
+    run("streaming, posts + employees", concurrency, stream=True)
+    run("streaming, employees only", concurrency, stream=True, include_posts=False)
+    run("streaming, page fields only", concurrency, stream=True, include_posts=False, include_employees=False)
+    server.shutdown()
@@ -0,0 +1,89 @@
+# benchmarks/bench_write_behind.py
+"""
+Pages persisted per second: one commit per page vs the write-behind group commit.
+
+Persists synthetic scrape results (with employees) through `persist_scraped_page`, the way a
+bulk refresh would. Uses a SQLite file by default; point BENCH_DATABASE_URL at MySQL to
+measure the real thing. Run from the repository root:
+
+    python -m benchmarks.bench_write_behind [pages] [batch_size]
+"""
+import os
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.write_behind import WriteBehindWriter
+from app.services import page_service
+
+def scraped(i: int) -> dict:
+    return {
+        "name": f"Company {i}",
+        "url": f"https://www.linkedin.com/company/company-{i}/",
+        "description": "Benchmark company " * 10,
+        "industry": "Software Development",
+        "followers_count": i * 7,
+        "head_count": "51-200 employees",
+        "posts": [],
+        "employees": [{"name": f"Person {i}-{j}", "profile_url": f"https://www.linkedin.com/in/p-{i}-{j}"} for j in range(3)],
+    }
+
+def make_session_factory(url: str):
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def per_page_commits(session_factory, pages: int) -> float:
+    db = session_factory()
+    started = time.perf_counter()
+    for i in range(pages):
+        page_service.persist_scraped_page(db, f"company-{i}", scraped(i))
+        db.commit()
+    elapsed = time.perf_counter() - started
+    db.close()
+    return pages / elapsed
+
+def write_behind(session_factory, pages: int, batch_size: int, durability: str) -> float:
+    with tempfile.TemporaryDirectory() as journal_dir:
+        writer = WriteBehindWriter(
+            persist=page_service.persist_scraped_page,
+            session_factory=session_factory,
+            batch_size=batch_size,
+            flush_interval_ms=50,
+            max_buffer=batch_size * 4,
+            durability=durability,
+            journal_dir=journal_dir,
+        )
+        writer.start()
+        started = time.perf_counter()
+        futures = [writer.submit(f"company-{i}", scraped(i)) for i in range(pages)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+        writer.stop()
+    return pages / elapsed
+
+if __name__ == "__main__":
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = os.getenv("BENCH_DATABASE_URL", f"sqlite:///{tmp}/bench.db")
+        print(f"{pages} pages, batch size {batch_size}, {url.split(':')[0]}")
+
+        engine, session_factory = make_session_factory(url)
+        print(f"{'per-page commit':<30} {per_page_commits(session_factory, pages):>8.0f} pages/s")
+        engine.dispose()
+
+        for durability in ("memory", "journal", "journal_fsync"):
+            engine, session_factory = make_session_factory(url)
+            rate = write_behind(session_factory, pages, batch_size, durability)
+            print(f"{'write-behind, ' + durability:<30} {rate:>8.0f} pages/s")
+            engine.dispose()
@@ -0,0 +1,122 @@
+# tests/test_admission.py
+import os
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import asyncio
+import time
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.core import admission, database
+from app.core.database import Base, get_db
+from app.core.write_behind import WriteBehindFull
+from app.models import Page
+from app.services import page_service
+
+WARM_READ_SLO = 0.25  # seconds, p99 of cache-hit reads while cold scrapes are flooding
+STUB_SCRAPE_SECONDS = 0.5
+
+@pytest.fixture(autouse=True)
+def test_db(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'admission.db'}", connect_args={"check_same_thread": False})
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    db = TestingSessionLocal()
+    db.add(Page(page_id="warm-page", linkedin_id="warm-page", name="Warm Page"))
+    db.commit()
+    db.close()
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr(database, "SessionLocal", TestingSessionLocal)
+    app.dependency_overrides[get_db] = override_get_db
+    yield
+    app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
+
+def stub_scrape_and_save_page(db, page_id):
+    # Stands in for LinkedIn: slow, and never finds the page
+    time.sleep(STUB_SCRAPE_SECONDS)
+    return None
+
+async def flood(cold_requests: int, warm_requests: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def cold(i):
+            return await client.get(f"/pages/cold-page-{i}")
+
+        async def warm():
+            await asyncio.sleep(0.05)  # let the cold burst fill the queue first
+            started = time.perf_counter()
+            response = await client.get("/pages/warm-page")
+            return response, time.perf_counter() - started
+
+        cold_tasks = [asyncio.create_task(cold(i)) for i in range(cold_requests)]
+        warm_results = await asyncio.gather(*(warm() for _ in range(warm_requests)))
+        cold_responses = await asyncio.gather(*cold_tasks)
+        metrics = (await client.get("/metrics/admission")).json()
+    return cold_responses, warm_results, metrics
+
+def test_flood_sheds_cold_scrapes_and_keeps_warm_reads_fast(monkeypatch):
+    monkeypatch.setattr(page_service, "scrape_and_save_page", stub_scrape_and_save_page)
+    monkeypatch.setattr(admission, "scrape_admission", admission.AdmissionController(
+        max_concurrent=2, max_queue=2, per_client_limit=100, queue_timeout=5, retry_after=3
+    ))
+
+    cold_responses, warm_results, metrics = asyncio.run(flood(cold_requests=30, warm_requests=20))
+
+    statuses = [r.status_code for r in cold_responses]
+    assert statuses.count(404) == 4  # two running plus two queued reach the (stub) scraper
+    assert statuses.count(503) == 26
+    assert all(r.headers["Retry-After"] == "3" for r in cold_responses if r.status_code == 503)
+
+    latencies = sorted(latency for _, latency in warm_results)
+    assert all(r.status_code == 200 for r, _ in warm_results)
+    assert latencies[int(len(latencies) * 0.99) - 1] < WARM_READ_SLO
+
+    assert metrics["rejected_queue_full"] == 26
+    assert metrics["queue_depth"] == 0
+    assert metrics["in_flight"] == 0
+
+def test_client_quota_returns_429(monkeypatch):
+    monkeypatch.setattr(page_service, "scrape_and_save_page", stub_scrape_and_save_page)
+    monkeypatch.setattr(admission, "scrape_admission", admission.AdmissionController(
+        max_concurrent=4, max_queue=16, per_client_limit=1, retry_after=7
+    ))
+
+    cold_responses, _, metrics = asyncio.run(flood(cold_requests=3, warm_requests=1))
+
+    statuses = sorted(r.status_code for r in cold_responses)
+    assert statuses == [404, 429, 429]
+    assert all(r.headers["Retry-After"] == "7" for r in cold_responses if r.status_code == 429)
+    assert metrics["rejected_client_quota"] == 2
+
+def test_full_write_behind_returns_503(monkeypatch):
+    def full_write_behind(db, page_id):
+        raise WriteBehindFull("Write-behind buffer is full")
+
+    monkeypatch.setattr(page_service, "scrape_and_save_page", full_write_behind)
+    monkeypatch.setattr(admission, "scrape_admission", admission.AdmissionController(retry_after=9))
+
+    cold_responses, _, _ = asyncio.run(flood(cold_requests=1, warm_requests=1))
+
+    assert cold_responses[0].status_code == 503
+    assert cold_responses[0].headers["Retry-After"] == "9"
+
+def test_client_identity(monkeypatch):
+    monkeypatch.setattr(admission, "SCRAPE_API_KEYS", {"a", "b"})
+    assert admission.client_identity({}, "10.0.0.1") == "10.0.0.1"
+    assert admission.client_identity({"x-forwarded-for": "1.2.3.4"}, "10.0.0.1") == "10.0.0.1"
+    assert admission.client_identity({"x-api-key": "a"}, "10.0.0.1") != admission.client_identity({"x-api-key": "b"}, "10.0.0.1")
+    # Unknown keys do not get a quota of their own
+    assert admission.client_identity({"x-api-key": "random"}, "10.0.0.1") == "10.0.0.1"
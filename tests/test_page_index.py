@@ -0,0 +1,109 @@
+# tests/test_page_index.py
+import os
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import random
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.page_index import PageIndex, INDEX_FIELDS
+from app.models import Page
+from app.services import page_service
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    rng = random.Random(0)
+    words = ["Deep", "Solv", "Cloud", "Data", "Labs", "AI"]
+    for i in range(300):
+        session.add(Page(
+            page_id=f"page-{i}",
+            linkedin_id=f"page-{i}",
+            name=" ".join(rng.choice(words) for _ in range(2)),
+            industry=rng.choice(["Software", "Finance", None]),
+            followers_count=rng.choice([None, rng.randint(0, 10000)]),
+        ))
+    session.commit()
+    yield session
+    session.close()
+
+@pytest.fixture
+def index(db, monkeypatch):
+    index = PageIndex(enabled=True)
+    index.resync(db)
+    monkeypatch.setattr(page_service, "page_index", index)
+    return index
+
+def sql_page_ids(db, **filters):
+    with pytest.MonkeyPatch.context() as m:
+        m.setattr(page_service, "page_index", PageIndex(enabled=False))
+        return [p.page_id for p in page_service.get_paged_pages(db, **filters)]
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"skip": 20, "limit": 15},
+    {"name": "deep"},
+    {"name": "ai", "skip": 3},
+    {"name": "CLOUD DA", "limit": 50},
+    {"name": "nothing-like-this"},
+    {"industry": "Software", "limit": 100},
+    {"industry": "Unknown"},
+    {"min_followers": 2000},
+    {"max_followers": 500, "limit": 100},
+    {"min_followers": 1000, "max_followers": 6000, "industry": "Finance", "name": "labs"},
+    {"limit": 0},
+])
+def test_index_matches_sql(db, index, filters):
+    indexed = [p.page_id for p in page_service.get_paged_pages(db, **filters)]
+    assert indexed == sql_page_ids(db, **filters)
+    assert index.hits == 1
+
+def test_upsert_updates_columns(db, index):
+    db_page = db.query(Page).filter(Page.page_id == "page-7").first()
+    db_page.name = "Renamed Zebra"
+    db_page.industry = "Aerospace"
+    db_page.followers_count = 123456
+    db.commit()
+    index.upsert(db_page)
+
+    assert index.query(name="zebra", industry="Aerospace", min_followers=100000) == [db_page.id]
+    assert index.query(name="zebra", industry="Software") == []
+
+def test_upsert_during_resync_survives_the_swap(db, index):
+    snapshot = [{field: getattr(p, field) for field in INDEX_FIELDS} for p in db.query(Page).order_by(Page.id)]
+    db_page = db.query(Page).filter(Page.page_id == "page-7").first()
+
+    def rows_read_before_the_rename():
+        for i, row in enumerate(snapshot):
+            if i == 100:
+                # A scrape commits a rename while the resync is still reading its (older) snapshot
+                db_page.name = "Renamed Zebra"
+                db.commit()
+                index.upsert(db_page)
+            yield row
+
+    index.load(rows_read_before_the_rename())
+
+    assert index.query(name="zebra") == [db_page.id]
+    assert index._loading_upserts is None
+
+def test_not_ready_falls_back_to_sql(db, monkeypatch):
+    stale = PageIndex(enabled=True, max_staleness=0)
+    stale.resync(db)
+    monkeypatch.setattr(page_service, "page_index", stale)
+
+    pages = page_service.get_paged_pages(db, limit=5)
+    assert isinstance(pages[0], Page)
+    assert stale.misses == 1
+
+def test_footprint_report(index):
+    report = index.footprint()
+    assert report["pages"] == 300
+    assert report["total"] > 0
+    assert report["total_per_million_pages"] > report["total"]
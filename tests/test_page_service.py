@@ -0,0 +1,138 @@
+# tests/test_page_service.py
+import os
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import Page, Post, Comment
+from app.services import page_service
+
+def urn(activity_id):
+    return f"urn:li:activity:{activity_id}"
+
+def card(activity_id, content=None, comments_count=0):
+    return {"activity_urn": urn(activity_id), "content": content or f"post {activity_id}", "comments_count": comments_count}
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    yield session
+    session.close()
+
+@pytest.fixture
+def db_page(db):
+    page = Page(page_id="deepsolv", linkedin_id="deepsolv", name="DeepSolv")
+    db.add(page)
+    db.commit()
+    return page
+
+@pytest.fixture
+def feed(monkeypatch):
+    """Stub feed: `pages` holds the cards served for each start offset, `requests` records the offsets asked for."""
+    stub = {"pages": {}, "requests": [], "comments": {}}
+
+    def fetch_feed_page(page_id, start):
+        stub["requests"].append(start)
+        return stub["pages"].get(start, [])
+
+    monkeypatch.setattr(page_service, "fetch_feed_page", fetch_feed_page)
+    monkeypatch.setattr(page_service, "fetch_post_comments", lambda activity_urn: stub["comments"].get(activity_urn, []))
+    return stub
+
+def test_first_ingest_walks_feed_pages_and_sets_mark(db, db_page, feed):
+    feed["pages"] = {2: [card(8), card(7)], 4: [card(6)]}
+
+    added = page_service.ingest_page_feed(db, db_page, [card(10), card(9)])
+
+    assert added == 5
+    assert feed["requests"] == [2, 4, 5]
+    assert db_page.posts_high_water_mark == 10
+    assert {p.linkedin_id for p in db.query(Post)} == {urn(i) for i in range(6, 11)}
+
+def test_refresh_stops_at_high_water_mark(db, db_page, feed):
+    page_service.ingest_page_feed(db, db_page, [card(10), card(9)])
+    feed["requests"].clear()
+    feed["pages"] = {3: [card(8), card(7)]}
+
+    added = page_service.ingest_page_feed(db, db_page, [card(12), card(11), card(10)])
+
+    assert added == 2
+    assert feed["requests"] == []
+    assert db_page.posts_high_water_mark == 12
+
+def test_cut_off_walk_keeps_high_water_mark(db, db_page, feed):
+    page_service.ingest_page_feed(db, db_page, [card(10), card(9)])
+    feed["pages"] = {2: [card(14), card(13)], 4: [card(12), card(11), card(10)]}
+
+    added = page_service.ingest_page_feed(db, db_page, [card(16), card(15)], max_pages=2)
+
+    assert added == 4
+    assert db_page.posts_high_water_mark == 10
+
+    added = page_service.ingest_page_feed(db, db_page, [card(16), card(15)], max_pages=3)
+
+    assert added == 2
+    assert db_page.posts_high_water_mark == 16
+    assert {p.linkedin_id for p in db.query(Post)} == {urn(i) for i in range(9, 17)}
+
+def test_pinned_post_at_top_does_not_stop_refresh(db, db_page, feed):
+    page_service.ingest_page_feed(db, db_page, [card(10), card(5)])
+
+    added = page_service.ingest_page_feed(db, db_page, [card(5), card(11), card(10)])
+
+    assert added == 1
+    assert db_page.posts_high_water_mark == 11
+
+def test_duplicate_urns_are_stored_once(db, db_page, feed):
+    feed["pages"] = {2: [card(9), card(8)]}
+
+    added = page_service.ingest_page_feed(db, db_page, [card(10), card(9)])
+
+    assert added == 3
+    assert db.query(Post).count() == 3
+
+def test_legacy_hashed_post_is_rekeyed_not_duplicated(db, db_page, feed):
+    author = page_service.get_default_author(db, db_page)
+    db.add(Post(linkedin_id=page_service.generate_unique_id("post", db_page.id, "Hello", 0),
+                content="Hello", page_id=db_page.id, author_user_id=author.id))
+    db.commit()
+
+    added = page_service.ingest_page_feed(db, db_page, [card(10, content="Hello")])
+
+    assert added == 0
+    assert [p.linkedin_id for p in db.query(Post)] == [urn(10)]
+    assert db_page.posts_high_water_mark == 10
+
+def test_cards_without_content_are_skipped(db, db_page, feed):
+    author = page_service.get_default_author(db, db_page)
+    db.add(Post(linkedin_id=page_service.generate_unique_id("post", db_page.id, "No content found", 0),
+                content="No content found", page_id=db_page.id, author_user_id=author.id))
+    db.commit()
+    empty = {"activity_urn": None, "content": None, "comments_count": 0}
+
+    added = page_service.ingest_page_feed(db, db_page, [card(11), empty, dict(card(10), content=None), empty])
+
+    assert added == 1
+    assert sorted(p.linkedin_id for p in db.query(Post)) == sorted([urn(11), page_service.generate_unique_id("post", db_page.id, "No content found", 0)])
+    assert db_page.posts_high_water_mark == 11
+
+def test_comments_are_ingested_for_new_posts(db, db_page, feed):
+    feed["comments"][urn(10)] = [
+        {"comment_urn": "urn:li:comment:(activity:10,1)", "content": "Congrats!", "likes_count": 2,
+         "author_name": "Jane Doe", "author_profile_url": "https://www.linkedin.com/in/jane-doe"},
+        {"comment_urn": "urn:li:comment:(activity:10,1)", "content": "Congrats!", "likes_count": 2,
+         "author_name": "Jane Doe", "author_profile_url": "https://www.linkedin.com/in/jane-doe"},
+    ]
+
+    page_service.ingest_page_feed(db, db_page, [card(10, comments_count=1), card(9)])
+
+    comments = db.query(Comment).all()
+    assert len(comments) == 1
+    assert comments[0].post.linkedin_id == urn(10)
+    assert comments[0].author.name == "Jane Doe"
@@ -0,0 +1,152 @@
+# tests/test_scraper.py
+import pytest
+from bs4 import BeautifulSoup
+from app.core import scraper
+from app.core.scraper import parse_feed_posts, parse_post_comments, activity_id_from_urn
+
+FEED_HTML = """
+<article class="main-feed-activity-card" data-activity-urn="urn:li:activity:7200000000000000002">
+  <p class="attributed-text-segment-list__content">Newest post</p>
+  <span data-test-id="social-actions__reaction-count">1,204</span>
+  <a data-test-id="social-actions__comments">12 Comments</a>
+</article>
+<article class="main-feed-activity-card">
+  <a href="https://www.linkedin.com/posts/deepsolv_ai-activity-7200000000000000001-AbCd">share</a>
+  <p class="attributed-text-segment-list__content">Older post</p>
+</article>
+<article class="main-feed-activity-card">
+  <img src="https://media.example.com/video-thumbnail.jpg">
+</article>
+"""
+
+POST_HTML = """
+<section class="comment" data-id="urn:li:comment:(activity:7200000000000000002,7200000000000000099)">
+  <a class="comment__author" href="https://www.linkedin.com/in/jane-doe?trk=x">Jane Doe</a>
+  <p class="comment__text">Congrats!</p>
+</section>
+"""
+
+def test_parse_feed_posts_uses_activity_urn():
+    posts = parse_feed_posts(BeautifulSoup(FEED_HTML, 'html.parser'))
+    assert [p["activity_urn"] for p in posts][:2] == [
+        "urn:li:activity:7200000000000000002",
+        "urn:li:activity:7200000000000000001",
+    ]
+    assert posts[2] == {"activity_urn": None, "content": None, "likes_count": 0, "comments_count": 0}
+    assert posts[0]["likes_count"] == 1204
+    assert posts[0]["comments_count"] == 12
+    assert activity_id_from_urn(posts[0]["activity_urn"]) > activity_id_from_urn(posts[1]["activity_urn"])
+
+def test_parse_post_comments():
+    comments = parse_post_comments(BeautifulSoup(POST_HTML, 'html.parser'))
+    assert comments == [{
+        "comment_urn": "urn:li:comment:(activity:7200000000000000002,7200000000000000099)",
+        "content": "Congrats!",
+        "likes_count": 0,
+        "author_name": "Jane Doe",
+        "author_profile_url": "https://www.linkedin.com/in/jane-doe",
+    }]
+
+PAGE_HTML = """<html><head>
+<script type="application/ld+json">{"@type": "Organization", "name": "DeepSolv", "description": "AI",
+ "sameAs": "https://deepsolv.ai", "logo": {"contentUrl": "https://img/logo.png"}, "numberOfEmployees": {"value": 42}}</script>
+<meta name="description" content="DeepSolv | 2,500 followers on LinkedIn">
+</head><body>
+<dd data-test-id="about-us__industry">Software</dd>
+<dd data-test-id="about-us__specialties">AI, ML</dd>
+<section data-test-id="employees-at"><ul><li>
+  <a class="base-card" href="/in/jane"><h3 class="base-main-card__title">Jane</h3></a>
+</li></ul></section>
+""" + "<div>filler</div>" * 5000 + FEED_HTML + "</body></html>"
+
+# Top card and about-us first, JSON-LD further down the body
+LATE_JSON_LD_HTML = """<html><head>
+<meta name="description" content="DeepSolv | 2,500 followers on LinkedIn">
+</head><body>
+<img class="top-card-layout__entity-image" data-delayed-url="https://img/top-card.png">
+<h1 class="top-card-layout__title">Top Card Name</h1>
+<a aria-describedby="websiteLinkDescription" href="https://top-card.example.com">site</a>
+<p data-test-id="about-us__description">Top card description</p>
+<dd data-test-id="about-us__industry">Software</dd>
+<dd data-test-id="about-us__size">201-500 employees</dd>
+<dd data-test-id="about-us__specialties">AI, ML</dd>
+""" + "<div>filler</div>" * 2000 + """
+<script type="application/ld+json">{"@type": "Organization", "name": "JSONLD Name", "description": "JSONLD description",
+ "sameAs": "https://deepsolv.ai", "logo": {"contentUrl": "https://img/logo.png"}, "numberOfEmployees": {"value": 250}}</script>
+""" + "<div>filler</div>" * 5000 + "</body></html>"
+
+class FakeStreamResponse:
+    def __init__(self, body):
+        self.body = body.encode()
+        self.bytes_read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), chunk_size):
+            chunk = self.body[i:i + chunk_size]
+            self.bytes_read += len(chunk)
+            yield chunk
+
+class FakeResponses(list):
+    page_html = PAGE_HTML
+
+@pytest.fixture
+def fake_get(monkeypatch):
+    responses = FakeResponses()
+
+    def get(url, headers=None, stream=False):
+        responses.append(FakeStreamResponse(responses.page_html))
+        return responses[-1]
+
+    monkeypatch.setattr(scraper.requests, "get", get)
+    return responses
+
+def full_fetch(monkeypatch, page_html):
+    monkeypatch.setattr(scraper.requests, "get", lambda url, headers=None: type(
+        "Response", (), {"content": page_html.encode(), "raise_for_status": lambda self: None})())
+
+def test_streaming_stops_once_fields_are_resolved(fake_get):
+    data = scraper.scrape_linkedin_page("deepsolv", include_posts=False, include_employees=False, stream=True)
+
+    assert fake_get[0].bytes_read < len(PAGE_HTML) // 4
+    assert data["industry"] == "Software"
+    assert data["specialities"] == "AI, ML"
+    assert data["followers_count"] == 2500
+    assert data["head_count"] == "42"
+    assert data["posts"] == [] and data["employees"] == []
+
+def test_streaming_matches_full_fetch_when_posts_are_requested(fake_get, monkeypatch):
+    streamed = scraper.scrape_linkedin_page("deepsolv", stream=True)
+    assert fake_get[0].bytes_read == len(PAGE_HTML)
+
+    full_fetch(monkeypatch, PAGE_HTML)
+    assert streamed == scraper.scrape_linkedin_page("deepsolv", stream=False)
+    assert len(streamed["posts"]) == 3 and len(streamed["employees"]) == 1
+
+def test_streaming_respects_max_bytes(fake_get):
+    html = scraper.stream_page_html("https://example.com", max_bytes=1000)
+    assert len(html) == 1000
+
+def test_streaming_reads_through_employees_only_when_requested(fake_get):
+    data = scraper.scrape_linkedin_page("deepsolv", include_posts=False, stream=True)
+    assert len(data["employees"]) == 1
+    assert fake_get[0].bytes_read < len(PAGE_HTML) // 4
+
+def test_streaming_waits_for_json_ld_after_top_card(fake_get, monkeypatch):
+    fake_get.page_html = LATE_JSON_LD_HTML
+    streamed = scraper.scrape_linkedin_page("deepsolv", include_posts=False, include_employees=False, stream=True)
+
+    assert len(LATE_JSON_LD_HTML) // 2 > fake_get[0].bytes_read > LATE_JSON_LD_HTML.index("application/ld+json")
+    assert streamed["name"] == "JSONLD Name"
+    assert streamed["head_count"] == "250"
+
+    full_fetch(monkeypatch, LATE_JSON_LD_HTML)
+    assert streamed == scraper.scrape_linkedin_page("deepsolv", include_posts=False, include_employees=False, stream=False)
@@ -0,0 +1,221 @@
+# tests/test_write_behind.py
+import os
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import json
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.core.write_behind import WriteBehindWriter, WriteBehindFull, WriteBehindUnavailable
+from app.models import Page
+from app.services import page_service
+
+def scraped(name):
+    return {"name": name, "industry": "Software", "followers_count": 10, "posts": [], "employees": []}
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'write_behind.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+def make_writer(session_factory, tmp_path, persist=page_service.persist_scraped_page, **kwargs):
+    options = {"batch_size": 5, "flush_interval_ms": 20, "durability": "memory", "journal_dir": str(tmp_path / "journal")}
+    options.update(kwargs)
+    return WriteBehindWriter(persist=persist, session_factory=session_factory, **options)
+
+def page_ids(session_factory):
+    db = session_factory()
+    try:
+        return sorted(p.page_id for p in db.query(Page))
+    finally:
+        db.close()
+
+def test_records_are_group_committed(session_factory, tmp_path):
+    writer = make_writer(session_factory, tmp_path, flush_interval_ms=1000)
+    writer.start()
+    futures = [writer.submit(f"page-{i}", scraped(f"Page {i}")) for i in range(10)]
+
+    assert all(isinstance(f.result(timeout=5), int) for f in futures)
+    writer.stop()
+    assert writer.flushed_records == 10
+    assert writer.flushed_batches <= 3
+    assert page_ids(session_factory) == sorted(f"page-{i}" for i in range(10))
+
+def test_failed_record_does_not_fail_its_batch(session_factory, tmp_path):
+    def persist(db, page_id, scraped_data):
+        if page_id == "bad":
+            db.add(Page(page_id="page-0"))  # violates the unique page_id
+            db.flush()
+        return page_service.persist_scraped_page(db, page_id, scraped_data)
+
+    writer = make_writer(session_factory, tmp_path, persist=persist, flush_interval_ms=1000, batch_size=3)
+    writer.start()
+    futures = [writer.submit(page_id, scraped(page_id)) for page_id in ("page-0", "bad", "page-1")]
+
+    assert [f.result(timeout=5) is not None for f in futures] == [True, False, True]
+    writer.stop()
+    assert page_ids(session_factory) == ["page-0", "page-1"]
+    assert writer.failed_records == 1
+
+def test_full_buffer_applies_backpressure(session_factory, tmp_path):
+    release = threading.Event()
+
+    def slow_persist(db, page_id, scraped_data):
+        release.wait(5)
+        return page_service.persist_scraped_page(db, page_id, scraped_data)
+
+    writer = make_writer(session_factory, tmp_path, persist=slow_persist, batch_size=1, max_buffer=2, submit_timeout=0.1)
+    writer.start()
+    first = writer.submit("page-0", scraped("Page 0"))
+    while writer.stats()["buffered"]:
+        pass  # wait for the writer to take the first record
+    writer.submit("page-1", scraped("Page 1"))
+    writer.submit("page-2", scraped("Page 2"))
+
+    with pytest.raises(WriteBehindFull):
+        writer.submit("page-3", scraped("Page 3"))
+    assert writer.stats()["rejected_full"] == 1
+
+    release.set()
+    assert first.result(timeout=5)
+    writer.stop()
+    assert page_ids(session_factory) == ["page-0", "page-1", "page-2"]
+
+def test_stop_flushes_buffered_records(session_factory, tmp_path):
+    writer = make_writer(session_factory, tmp_path, batch_size=100, flush_interval_ms=60_000, durability="journal")
+    writer.start()
+    future = writer.submit("page-0", scraped("Page 0"))
+
+    writer.stop()
+    assert future.result(timeout=0) is not None
+    assert page_ids(session_factory) == ["page-0"]
+    assert os.listdir(tmp_path / "journal") == []
+
+def test_journal_is_replayed_on_start(session_factory, tmp_path):
+    journal_dir = tmp_path / "journal"
+    journal_dir.mkdir()
+    with open(journal_dir / "segment-1-1.jsonl", "w") as segment:
+        segment.write(json.dumps({"page_id": "page-0", "scraped_data": scraped("Page 0")}) + "\n")
+    with open(journal_dir / "current.jsonl", "w") as current:
+        current.write(json.dumps({"page_id": "page-1", "scraped_data": scraped("Page 1")}) + "\n")
+        current.write('{"page_id": "torn')  # crash mid-append
+
+    writer = make_writer(session_factory, tmp_path, durability="journal_fsync")
+    writer.start()
+    writer.stop()
+
+    assert page_ids(session_factory) == ["page-0", "page-1"]
+    assert os.listdir(journal_dir) == []
+
+def test_unknown_durability_is_rejected(session_factory, tmp_path):
+    with pytest.raises(ValueError):
+        make_writer(session_factory, tmp_path, durability="eventually")
+
+def test_scrape_and_save_page_goes_through_running_writer(session_factory, tmp_path, monkeypatch):
+    writer = make_writer(session_factory, tmp_path)
+    monkeypatch.setattr(page_service, "page_writer", writer)
+    monkeypatch.setattr(page_service, "scrape_page", lambda db, page_id, **kwargs: scraped("DeepSolv"))
+    writer.start()
+
+    db = session_factory()
+    db_page = page_service.scrape_and_save_page(db, "deepsolv")
+    writer.stop()
+
+    assert db_page.page_id == "deepsolv" and db_page.name == "DeepSolv"
+    assert writer.flushed_records == 1
+    db.close()
+
+def test_dead_writer_fails_pending_records_and_stops(session_factory, tmp_path):
+    def broken_session_factory():
+        raise RuntimeError("cannot create session")
+
+    writer = make_writer(broken_session_factory, tmp_path)
+    writer.start()
+    future = writer.submit("page-0", scraped("Page 0"))
+
+    with pytest.raises(WriteBehindUnavailable):
+        future.result(timeout=5)
+    assert not writer.running
+    with pytest.raises(WriteBehindUnavailable):
+        writer.submit("page-1", scraped("Page 1"))
+    writer.stop()
+
+def test_scrape_and_save_page_does_not_wait_forever(session_factory, tmp_path, monkeypatch):
+    release = threading.Event()
+
+    def stuck_persist(db, page_id, scraped_data):
+        release.wait(5)
+        return page_service.persist_scraped_page(db, page_id, scraped_data)
+
+    writer = make_writer(session_factory, tmp_path, persist=stuck_persist)
+    monkeypatch.setattr(page_service, "page_writer", writer)
+    monkeypatch.setattr(page_service, "WRITE_BEHIND_RESULT_TIMEOUT", 0.1)
+    monkeypatch.setattr(page_service, "scrape_page", lambda db, page_id, **kwargs: scraped("DeepSolv"))
+    writer.start()
+
+    db = session_factory()
+    with pytest.raises(WriteBehindUnavailable):
+        page_service.scrape_and_save_page(db, "deepsolv")
+    release.set()
+    writer.stop()
+    db.close()
+
+def test_database_outage_keeps_the_journal(session_factory, tmp_path):
+    from sqlalchemy.exc import OperationalError
+
+    def unavailable(db, page_id, scraped_data):
+        raise OperationalError("INSERT", {}, Exception("server has gone away"))
+
+    writer = make_writer(session_factory, tmp_path, persist=unavailable, durability="journal")
+    writer.start()
+    future = writer.submit("page-0", scraped("Page 0"))
+
+    with pytest.raises(OperationalError):
+        future.result(timeout=5)
+    writer.stop()
+    assert len(os.listdir(tmp_path / "journal")) == 1
+
+    replaying = make_writer(session_factory, tmp_path, durability="journal")
+    replaying.start()
+    replaying.stop()
+    assert page_ids(session_factory) == ["page-0"]
+    assert os.listdir(tmp_path / "journal") == []
+
+def test_replay_deletes_committed_segments_and_dead_letters_failing_records(session_factory, tmp_path):
+    from sqlalchemy.exc import OperationalError
+
+    def persist(db, page_id, scraped_data):
+        if page_id == "poison":
+            raise OperationalError("INSERT", {}, Exception("(1366, 'Incorrect string value')"))
+        return page_service.persist_scraped_page(db, page_id, scraped_data)
+
+    journal_dir = tmp_path / "journal"
+    journal_dir.mkdir()
+    with open(journal_dir / "segment-1-1.jsonl", "w") as segment:
+        segment.write(json.dumps({"page_id": "page-0", "scraped_data": scraped("Page 0")}) + "\n")
+    with open(journal_dir / "segment-2-2.jsonl", "w") as segment:
+        segment.write(json.dumps({"page_id": "poison", "scraped_data": scraped("Poison")}) + "\n")
+        segment.write(json.dumps({"page_id": "page-1", "scraped_data": scraped("Page 1")}) + "\n")
+
+    for replay in range(2):
+        writer = make_writer(session_factory, tmp_path, persist=persist, durability="journal", max_replays=2)
+        writer.start()
+        writer.stop()
+        assert page_ids(session_factory) == ["page-0", "page-1"]
+
+        if replay == 0:
+            # Committed records are gone from the journal, the failed one waits for the next start
+            assert sorted(os.listdir(journal_dir)) == ["segment-2-2.jsonl"]
+            with open(journal_dir / "segment-2-2.jsonl") as segment:
+                assert [json.loads(line)["page_id"] for line in segment] == ["poison"]
+
+    assert os.listdir(journal_dir) == ["dead-letter.jsonl"]
+    assert writer.stats()["dead_lettered"] == 1
+    with open(journal_dir / "dead-letter.jsonl") as dead_letter:
+        assert json.loads(dead_letter.readline())["page_id"] == "poison"